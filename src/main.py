@@ -1,4 +1,7 @@
 """Main application entry point"""
+import asyncio
+import logging
+import sys
 import uvicorn
 from fastapi import FastAPI
 from fastapi.responses import FileResponse, HTMLResponse
@@ -18,9 +21,19 @@ from .services.load_balancer import LoadBalancer
 from .services.sora_client import SoraClient
 from .services.generation_handler import GenerationHandler
 from .services.concurrency_manager import ConcurrencyManager
+from .services.cf_cookie_manager import cf_cookie_manager
 from .api import routes as api_routes
 from .api import admin as admin_routes
 
+# Service modules log via logging.getLogger(__name__); show INFO and above
+# on stdout in the same plain format as the rest of the startup output
+_service_log_handler = logging.StreamHandler(sys.stdout)
+_service_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_service_logger = logging.getLogger(__package__)
+_service_logger.addHandler(_service_log_handler)
+_service_logger.setLevel(logging.INFO)
+_service_logger.propagate = False
+
 # Initialize scheduler (uses system local timezone by default)
 scheduler = AsyncIOScheduler()
 
@@ -42,8 +55,8 @@ app.add_middleware(
 
 # Initialize components
 db = Database()
-token_manager = TokenManager(db)
 proxy_manager = ProxyManager(db)
+token_manager = TokenManager(db, proxy_manager)
 concurrency_manager = ConcurrencyManager()
 load_balancer = LoadBalancer(token_manager, concurrency_manager)
 sora_client = SoraClient(proxy_manager)
@@ -158,6 +171,12 @@ async def startup_event():
     await concurrency_manager.initialize(all_tokens)
     print(f"✓ Concurrency manager initialized with {len(all_tokens)} tokens")
 
+    # Pre-warm CF cookies in the background for the global proxy and
+    # every active token's proxy, so requests don't pay the first solve
+    global_proxy = await proxy_manager.get_proxy_url()
+    warmup_proxies = [global_proxy] + [t.proxy_url for t in all_tokens if t.is_active and t.proxy_url]
+    app.state.cf_warmup_task = asyncio.create_task(cf_cookie_manager.warmup(warmup_proxies))
+
     # Start file cache cleanup task
     await generation_handler.file_cache.start_cleanup_task()
 
@@ -179,6 +198,15 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     await generation_handler.file_cache.stop_cleanup_task()
+    # Stop CF warmup before tearing down the browser it may be using
+    cf_warmup_task = getattr(app.state, "cf_warmup_task", None)
+    if cf_warmup_task and not cf_warmup_task.done():
+        cf_warmup_task.cancel()
+        try:
+            await cf_warmup_task
+        except asyncio.CancelledError:
+            pass
+    await cf_cookie_manager.shutdown()
     if scheduler.running:
         scheduler.shutdown()
 
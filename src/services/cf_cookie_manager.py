@@ -4,16 +4,25 @@ Uses Playwright to solve CF managed challenges and caches the resulting
 cookies (cf_clearance, etc.) for reuse by curl_cffi requests.
 """
 import asyncio
+import logging
 import re
 import time
-from typing import Optional, Dict, Tuple
+from collections import OrderedDict
+from typing import Optional, Dict, List, Tuple
+from urllib.parse import urlparse, unquote
 
 try:
     from playwright.async_api import async_playwright
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     PLAYWRIGHT_AVAILABLE = True
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
+    PlaywrightTimeoutError = asyncio.TimeoutError
 
+logger = logging.getLogger(__name__)
+
+# Bound once so the cache-hit path skips the attribute lookup
+_monotonic = time.monotonic
 
 # Default User-Agent that matches what Playwright/Chromium sends
 _DEFAULT_UA = (
@@ -22,77 +31,160 @@ _DEFAULT_UA = (
     "Chrome/131.0.0.0 Safari/537.36"
 )
 
+# Page visited to solve the CF challenge when no target is given
+DEFAULT_TARGET_URL = "https://sora.chatgpt.com/"
+
+# Resource types not needed to pass the CF challenge
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+
 
 class CfCookieManager:
     """Manages Cloudflare clearance cookies obtained via Playwright.
 
-    Cookies are cached per proxy URL and refreshed when they expire
-    (default TTL: 10 minutes).
+    Cookies are cached per (target host, proxy URL) and refreshed when they expire
+    (default TTL: 10 minutes). Once past SOFT_TTL the cached cookies are
+    still served while a background refresh runs, so callers only block
+    on Playwright when the cache is empty or hard-expired. Cache ages are
+    measured with time.monotonic(), so wall-clock jumps (NTP sync etc.)
+    cannot expire or extend entries.
+
+    A single Chromium instance is kept alive for the lifetime of the
+    process, with a small LRU pool of browser contexts (one per proxy)
+    that is reused across refreshes.
     """
 
-    # Cache TTL in seconds
+    # Cache TTL in seconds; entries older than this are never served
     CACHE_TTL = 600  # 10 minutes
+    # Entries older than this are served stale and refreshed in background
+    SOFT_TTL = 540  # 9 minutes
+    # Maximum number of pooled browser contexts (one per proxy)
+    MAX_CONTEXTS = 8
+    # Maximum number of per-proxy locks kept around
+    MAX_LOCKS = 1024
 
     def __init__(self):
-        # Cache structure: { proxy_key: (cookies_dict, user_agent, timestamp) }
-        self._cache: Dict[str, Tuple[Dict[str, str], str, float]] = {}
-        self._locks: Dict[str, asyncio.Lock] = {}
-        self._global_lock = asyncio.Lock()
+        # Cache structure: { (host, proxy_key): (cookies_dict, user_agent, timestamp) }
+        self._cache: Dict[Tuple[str, str], Tuple[Dict[str, str], str, float]] = {}
+        # Per-proxy locks in LRU order, capped at MAX_LOCKS so rotating
+        # proxies don't grow it forever
+        self._locks: "OrderedDict[str, asyncio.Lock]" = OrderedDict()
+        # In-flight background refreshes: { (host, proxy_key): Task }
+        self._refreshing: Dict[Tuple[str, str], asyncio.Task] = {}
+        # Long-lived Playwright driver and browser, launched lazily and
+        # shared by all proxies; only contexts are created per fetch.
+        self._pw = None
+        self._browser = None
+        self._browser_lock = asyncio.Lock()
+        # Pooled browser contexts in LRU order: { proxy_key: (BrowserContext, Page) }
+        # Reusing a context and its page keeps CF's challenge cookies and
+        # warmed connections, so repeat fetches often skip the challenge.
+        self._contexts: "OrderedDict[str, Tuple[object, object]]" = OrderedDict()
+        # Proxy keys whose pooled context should be replaced on next use
+        self._discard_contexts: set = set()
 
     def _proxy_key(self, proxy_url: Optional[str]) -> str:
         return proxy_url or "__no_proxy__"
 
-    async def _get_lock(self, key: str) -> asyncio.Lock:
-        async with self._global_lock:
-            if key not in self._locks:
-                self._locks[key] = asyncio.Lock()
-            return self._locks[key]
+    def _cache_key(self, target_url: str, proxy_url: Optional[str]) -> Tuple[str, str]:
+        return urlparse(target_url).hostname or target_url, self._proxy_key(proxy_url)
+
+    def _get_lock(self, key: str) -> asyncio.Lock:
+        # No await between lookup and insert, so the event loop cannot
+        # interleave another caller here and no global lock is needed.
+        lock = self._locks.get(key)
+        if lock is not None:
+            self._locks.move_to_end(key)
+            return lock
+
+        lock = self._locks[key] = asyncio.Lock()
+        if len(self._locks) > self.MAX_LOCKS:
+            # Evict the oldest lock nobody is holding
+            for old_key, old_lock in self._locks.items():
+                if old_key != key and not old_lock.locked():
+                    del self._locks[old_key]
+                    break
+        return lock
 
-    def _is_valid(self, key: str) -> bool:
-        if key not in self._cache:
-            return False
-        _, _, ts = self._cache[key]
-        return (time.time() - ts) < self.CACHE_TTL
+    def _is_fresh(self, key: Tuple[str, str]) -> bool:
+        entry = self._cache.get(key)
+        return entry is not None and (_monotonic() - entry[2]) < self.SOFT_TTL
 
     async def get_cookies(
-        self, proxy_url: Optional[str] = None, force_refresh: bool = False
+        self,
+        proxy_url: Optional[str] = None,
+        force_refresh: bool = False,
+        target_url: str = DEFAULT_TARGET_URL,
     ) -> Optional[Tuple[Dict[str, str], str]]:
-        """Get CF clearance cookies for the given proxy.
+        """Get CF clearance cookies for the given proxy and target site.
 
         Returns:
             Tuple of (cookies_dict, user_agent) or None on failure.
             cookies_dict maps cookie name -> cookie value.
         """
         if not PLAYWRIGHT_AVAILABLE:
-            print("[CF Cookie] Playwright not available, skipping CF cookie fetch")
+            logger.warning("[CF Cookie] Playwright not available, skipping CF cookie fetch")
             return None
 
-        key = self._proxy_key(proxy_url)
+        key = self._cache_key(target_url, proxy_url)
+
+        # Hot path: a single dict lookup, no I/O unless debug logging is on
+        entry = self._cache.get(key)
+        if not force_refresh and entry:
+            age = _monotonic() - entry[2]
+            # Return cached if fresh
+            if age < self.SOFT_TTL:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[CF Cookie] Using cached cookies (host=%s, proxy=%s)", key[0], key[1])
+                return entry[0], entry[1]
+
+            # Serve stale cookies immediately and refresh in background
+            if age < self.CACHE_TTL:
+                if key not in self._refreshing:
+                    self._refreshing[key] = asyncio.create_task(
+                        self._background_refresh(key, proxy_url, target_url)
+                    )
+                    logger.info(f"[CF Cookie] Using stale cookies, refreshing in background (host={key[0]}, proxy={key[1]})")
+                return entry[0], entry[1]
+
+        # Acquire per-proxy lock: all hosts for a proxy share one pooled page
+        lock = self._get_lock(key[1])
+        async with lock:
+            # Double-check after acquiring lock
+            entry = self._cache.get(key)
+            if not force_refresh and entry and (_monotonic() - entry[2]) < self.CACHE_TTL:
+                return entry[0], entry[1]
+
+            return await self._refresh(key, proxy_url, target_url)
 
-        # Return cached if valid
-        if not force_refresh and self._is_valid(key):
-            cookies, ua, _ = self._cache[key]
-            print(f"[CF Cookie] Using cached cookies (proxy={key})")
+    async def _refresh(
+        self, key: Tuple[str, str], proxy_url: Optional[str], target_url: str
+    ) -> Optional[Tuple[Dict[str, str], str]]:
+        """Fetch new cookies and store them. Caller must hold the proxy lock."""
+        logger.info(f"[CF Cookie] Fetching new CF cookies via Playwright (host={key[0]}, proxy={key[1]})...")
+        result = await self._fetch_cookies_via_browser(proxy_url, target_url)
+        if result:
+            cookies, ua = result
+            self._cache[key] = (cookies, ua, _monotonic())
+            logger.info(f"[CF Cookie] Cached {len(cookies)} cookies, TTL={self.CACHE_TTL}s")
             return cookies, ua
+        else:
+            logger.warning("[CF Cookie] Failed to obtain CF cookies")
+            return None
 
-        # Acquire per-proxy lock to avoid concurrent browser launches
-        lock = await self._get_lock(key)
-        async with lock:
-            # Double-check after acquiring lock
-            if not force_refresh and self._is_valid(key):
-                cookies, ua, _ = self._cache[key]
-                return cookies, ua
-
-            print(f"[CF Cookie] Fetching new CF cookies via Playwright (proxy={key})...")
-            result = await self._fetch_cookies_via_browser(proxy_url)
-            if result:
-                cookies, ua = result
-                self._cache[key] = (cookies, ua, time.time())
-                print(f"[CF Cookie] Cached {len(cookies)} cookies, TTL={self.CACHE_TTL}s")
-                return cookies, ua
-            else:
-                print(f"[CF Cookie] Failed to obtain CF cookies")
-                return None
+    async def _background_refresh(
+        self, key: Tuple[str, str], proxy_url: Optional[str], target_url: str
+    ):
+        """Refresh stale cookies without blocking the caller that saw them."""
+        try:
+            lock = self._get_lock(key[1])
+            async with lock:
+                # A forced refresh may have beaten us to it
+                if not self._is_fresh(key):
+                    await self._refresh(key, proxy_url, target_url)
+        except Exception as e:
+            logger.warning(f"[CF Cookie] Background refresh error: {e}")
+        finally:
+            self._refreshing.pop(key, None)
 
     @staticmethod
     def _parse_proxy_for_playwright(proxy_url: Optional[str]) -> Optional[Dict[str, str]]:
@@ -107,8 +199,6 @@ class CfCookieManager:
         if not proxy_url:
             return None
 
-        from urllib.parse import urlparse, unquote
-
         # socks5h -> socks5
         normalized = proxy_url
         if normalized.startswith("socks5h://"):
@@ -128,139 +218,329 @@ class CfCookieManager:
 
         return result
 
-    async def _fetch_cookies_via_browser(
-        self, proxy_url: Optional[str] = None
-    ) -> Optional[Tuple[Dict[str, str], str]]:
-        """Launch Playwright, navigate to sora.chatgpt.com, wait for CF
-        challenge to resolve, and extract cookies."""
-        pw = None
-        browser = None
-        # Parse proxy URL into Playwright-compatible format
-        proxy_config = self._parse_proxy_for_playwright(proxy_url)
-        try:
-            pw = await async_playwright().start()
+    async def _ensure_browser(self):
+        """Return the shared Chromium browser, launching it on first use."""
+        async with self._browser_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
 
-            launch_args = {
-                "headless": True,
-                "args": [
+            # Browser died or was never started: (re)start from scratch
+            await self._close_browser()
+
+            self._pw = await async_playwright().start()
+            self._browser = await self._pw.chromium.launch(
+                headless=True,
+                args=[
                     "--no-sandbox",
                     "--disable-setuid-sandbox",
                     "--disable-dev-shm-usage",
                     "--disable-gpu",
                     "--disable-blink-features=AutomationControlled",
                 ],
-            }
-            if proxy_config:
-                launch_args["proxy"] = proxy_config
-                print(f"[CF Cookie] Playwright proxy: server={proxy_config['server']}, has_auth={'username' in proxy_config}")
-
-            browser = await pw.chromium.launch(**launch_args)
-            context = await browser.new_context(
-                user_agent=_DEFAULT_UA,
-                viewport={"width": 1280, "height": 720},
-                locale="en-US",
-                timezone_id="America/New_York",
             )
+            logger.info("[CF Cookie] Launched shared Playwright browser")
+            return self._browser
+
+    async def _close_browser(self):
+        """Close the shared browser and stop the Playwright driver."""
+        # Pooled contexts belong to this browser and die with it
+        self._contexts.clear()
+        self._discard_contexts.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._pw is not None:
+            try:
+                await self._pw.stop()
+            except Exception:
+                pass
+            self._pw = None
 
-            # Hide webdriver property to bypass CF bot detection
-            await context.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-                Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
-                Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
-                window.chrome = { runtime: {} };
-            """)
+    async def _get_context(self, key: str, proxy_url: Optional[str]):
+        """Return the pooled (context, page) for a proxy, creating it on a miss.
 
-            page = await context.new_page()
+        Callers must hold the per-proxy lock for ``key``.
+        """
+        if key in self._discard_contexts:
+            # Invalidated: close it here, under the proxy lock, so no
+            # in-flight fetch is still using it
+            await self._close_context(key)
+        entry = self._contexts.get(key)
+        if entry is not None and self._browser is not None and self._browser.is_connected():
+            context, page = entry
+            if page.is_closed():
+                page = await context.new_page()
+                self._contexts[key] = (context, page)
+            self._contexts.move_to_end(key)
+            return context, page
+
+        browser = await self._ensure_browser()
+
+        context_args = {
+            "user_agent": _DEFAULT_UA,
+            "viewport": {"width": 1280, "height": 720},
+            "locale": "en-US",
+            "timezone_id": "America/New_York",
+        }
+        # Parse proxy URL into Playwright-compatible format
+        proxy_config = self._parse_proxy_for_playwright(proxy_url)
+        if proxy_config:
+            # Playwright supports per-context proxies, so one browser
+            # can serve every proxy
+            context_args["proxy"] = proxy_config
+            logger.debug(
+                "[CF Cookie] Playwright proxy: server=%s, has_auth=%s",
+                proxy_config["server"], "username" in proxy_config,
+            )
 
-            print("[CF Cookie] Navigating to sora.chatgpt.com ...")
-            # Navigate and let CF challenge run
-            try:
-                await page.goto(
-                    "https://sora.chatgpt.com/",
-                    wait_until="domcontentloaded",
-                    timeout=60000,
-                )
-            except Exception as nav_err:
-                # Even if navigation "fails" (e.g. timeout), CF may have
-                # set cookies already. Continue to check.
-                print(f"[CF Cookie] Navigation note: {nav_err}")
-
-            # Wait for CF challenge to complete.
-            # CF typically redirects or sets cf_clearance after the JS challenge.
-            # We poll for the cf_clearance cookie.
-            max_wait = 60  # seconds
-            poll_interval = 2  # seconds
-            waited = 0
-            cf_clearance_found = False
-
-            while waited < max_wait:
-                cookies_list = await context.cookies("https://sora.chatgpt.com")
-                for c in cookies_list:
-                    if c["name"] == "cf_clearance":
-                        cf_clearance_found = True
-                        break
-                if cf_clearance_found:
-                    break
+        context = await browser.new_context(**context_args)
 
-                # Check if page has loaded past CF challenge
-                try:
-                    title = await page.title()
-                    # CF challenge page has title "Just a moment..."
-                    if title and "just a moment" not in title.lower():
-                        # Page loaded past CF, cookies should be set
-                        cf_clearance_found = True
-                        break
-                except Exception:
-                    pass
+        # Hide webdriver property to bypass CF bot detection
+        await context.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+            Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
+            Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
+            window.chrome = { runtime: {} };
+        """)
 
-                await asyncio.sleep(poll_interval)
-                waited += poll_interval
+        # Only documents, scripts and XHR matter for the CF challenge;
+        # skip everything else to save bandwidth on slow proxies.
+        # Installed once per context so it survives pooling.
+        await context.route("**/*", self._block_heavy_resources)
 
-            # Extract all cookies for the domain
-            all_cookies = await context.cookies("https://sora.chatgpt.com")
-            cookies_dict = {}
-            for c in all_cookies:
-                cookies_dict[c["name"]] = c["value"]
+        page = await context.new_page()
+        self._contexts[key] = (context, page)
+        await self._evict_contexts()
+        return context, page
 
-            if not cf_clearance_found:
-                print(f"[CF Cookie] Warning: cf_clearance not found after {max_wait}s wait")
-                # Still return whatever cookies we got - they might work
-                if not cookies_dict:
-                    return None
+    @staticmethod
+    def _parse_set_cookie(line: str, host: str) -> Optional[Tuple[str, str]]:
+        """Parse one Set-Cookie line into (name, value).
 
-            print(f"[CF Cookie] Obtained cookies: {list(cookies_dict.keys())}")
+        Only the leading name=value pair is used. Returns None for cookies
+        that would not be sent with a request to ``host`` at "/": deleted
+        ones (empty value or Max-Age<=0), path-scoped ones, and ones for
+        another domain.
+        """
+        pair, _, attrs = line.partition(";")
+        name, sep, value = pair.partition("=")
+        name, value = name.strip(), value.strip()
+        if not sep or not name or not value:
+            return None
 
-            await context.close()
-            await browser.close()
-            await pw.stop()
+        for attr in attrs.split(";"):
+            attr_name, _, attr_value = attr.partition("=")
+            attr_name = attr_name.strip().lower()
+            attr_value = attr_value.strip()
+            if attr_name == "max-age" and attr_value.lstrip("-").isdigit() and int(attr_value) <= 0:
+                return None
+            if attr_name == "path" and attr_value not in ("", "/"):
+                return None
+            if attr_name == "domain":
+                domain = attr_value.lstrip(".").lower()
+                if host != domain and not host.endswith("." + domain):
+                    return None
 
-            return cookies_dict, _DEFAULT_UA
+        return name, value
 
-        except Exception as e:
-            print(f"[CF Cookie] Error: {e}")
-            if browser:
+    @staticmethod
+    async def _block_heavy_resources(route):
+        """Route handler that aborts non-essential resource requests."""
+        if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _evict_contexts(self):
+        """Close least recently used contexts beyond MAX_CONTEXTS.
+
+        Contexts whose proxy lock is currently held are in use by another
+        fetch and are skipped.
+        """
+        for old_key in list(self._contexts.keys()):
+            if len(self._contexts) <= self.MAX_CONTEXTS:
+                break
+            lock = self._locks.get(old_key)
+            if lock is not None and lock.locked():
+                continue
+            await self._close_context(old_key)
+
+    async def _close_context(self, key: str):
+        """Remove a context from the pool and close it."""
+        self._discard_contexts.discard(key)
+        entry = self._contexts.pop(key, None)
+        if entry is not None:
+            try:
+                # Closing the context also closes its page
+                await entry[0].close()
+            except Exception:
+                pass
+
+    async def shutdown(self):
+        """Release the shared browser. Called on application shutdown."""
+        # Stop background refreshes before closing what they navigate with
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._refreshing.clear()
+
+        async with self._browser_lock:
+            for key in list(self._contexts.keys()):
+                await self._close_context(key)
+            await self._close_browser()
+        logger.info("[CF Cookie] Playwright browser shut down")
+
+    async def _fetch_cookies_via_browser(
+        self, proxy_url: Optional[str] = None, target_url: str = DEFAULT_TARGET_URL
+    ) -> Optional[Tuple[Dict[str, str], str]]:
+        """Navigate to target_url in the proxy's pooled browser context,
+        wait for CF challenge to resolve, and extract cookies."""
+        key = self._proxy_key(proxy_url)
+        parsed_target = urlparse(target_url)
+        origin = f"{parsed_target.scheme}://{parsed_target.netloc}"
+        try:
+            context, page = await self._get_context(key, proxy_url)
+
+            # Wait for CF challenge to complete, driven by response events
+            # instead of polling. CF either sets cf_clearance once the JS
+            # challenge passes, or (if the pooled context is already
+            # cleared) serves the real document straight away. Challenge
+            # pages come back as 403 with a "cf-mitigated" header.
+            done = asyncio.Event()
+            # Cookies captured straight from Set-Cookie headers during this
+            # navigation, which usually saves the context.cookies() call
+            host = (parsed_target.hostname or "").lower()
+            header_cookies: Dict[str, str] = {}
+
+            async def on_response(response):
+                if not response.url.startswith(origin):
+                    return
                 try:
-                    await browser.close()
+                    headers = await response.headers_array()
+                    for header in headers:
+                        if header["name"].lower() != "set-cookie":
+                            continue
+                        # Multiple cookies may come newline-joined
+                        for line in header["value"].split("\n"):
+                            parsed = self._parse_set_cookie(line, host)
+                            if parsed:
+                                header_cookies[parsed[0]] = parsed[1]
+                    if done.is_set():
+                        return
+                    if header_cookies.get("cf_clearance"):
+                        done.set()
+                    elif (
+                        response.request.resource_type == "document"
+                        and response.status < 400
+                        and not any(h["name"].lower() == "cf-mitigated" for h in headers)
+                    ):
+                        done.set()
                 except Exception:
                     pass
-            if pw:
+
+            context.on("response", on_response)
+            max_wait = 60  # seconds
+            try:
+                logger.debug("[CF Cookie] Navigating to %s ...", target_url)
+                # Navigate and let CF challenge run
+                navigation_ok = True
                 try:
-                    await pw.stop()
-                except Exception:
-                    pass
+                    await page.goto(
+                        target_url,
+                        wait_until="domcontentloaded",
+                        timeout=60000,
+                    )
+                except PlaywrightTimeoutError as nav_err:
+                    # A navigation timeout doesn't mean CF failed; the
+                    # challenge may still finish. Continue to wait.
+                    logger.debug("[CF Cookie] Navigation note: %s", nav_err)
+                except Exception as nav_err:
+                    # Hard failure (proxy error, closed page, ...): no
+                    # response will ever arrive, so don't wait for one
+                    logger.warning(f"[CF Cookie] Navigation failed: {nav_err}")
+                    navigation_ok = False
+
+                if navigation_ok:
+                    try:
+                        await asyncio.wait_for(done.wait(), timeout=max_wait)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                # The context is pooled, so don't leak listeners across fetches
+                context.remove_listener("response", on_response)
+
+            if not done.is_set():
+                # The pooled jar may still hold an old cf_clearance; don't
+                # hand that out as a fresh result. Start clean next time.
+                if navigation_ok:
+                    logger.warning(f"[CF Cookie] CF challenge did not resolve within {max_wait}s")
+                await self._close_context(key)
+                return None
+
+            if "cf_clearance" in header_cookies:
+                # Fresh clearance seen on the wire: skip the CDP round-trip.
+                # Cookies set by JS or on earlier visits are not included.
+                cookies_dict = header_cookies
+            else:
+                # cf_clearance was set on an earlier visit by this pooled
+                # context: read the cookie jar once
+                all_cookies = await context.cookies(target_url)
+                cookies_dict = {c["name"]: c["value"] for c in all_cookies}
+
+            logger.info(f"[CF Cookie] Obtained cookies: {list(cookies_dict.keys())}")
+
+            return cookies_dict, _DEFAULT_UA
+
+        except Exception as e:
+            logger.warning(f"[CF Cookie] Error: {e}")
+            # Drop the context so the next attempt starts clean
+            await self._close_context(key)
             return None
 
-    def invalidate(self, proxy_url: Optional[str] = None):
-        """Invalidate cached cookies for a specific proxy."""
-        key = self._proxy_key(proxy_url)
+    async def warmup(self, proxies: List[Optional[str]]):
+        """Pre-populate the cache for the given proxies.
+
+        Called on startup so the first user request doesn't pay for the
+        browser launch and CF challenge.
+        """
+        unique = list(dict.fromkeys(proxies))
+        logger.info(f"[CF Cookie] Warming up CF cookies for {len(unique)} proxies...")
+        # At most MAX_CONTEXTS solves at once so the context pool (which
+        # can't evict contexts that are in use) doesn't balloon at boot
+        semaphore = asyncio.Semaphore(self.MAX_CONTEXTS)
+
+        async def warm(proxy_url: Optional[str]):
+            async with semaphore:
+                return await self.get_cookies(proxy_url)
+
+        results = await asyncio.gather(
+            *(warm(p) for p in unique), return_exceptions=True
+        )
+        ok = sum(1 for r in results if r and not isinstance(r, BaseException))
+        logger.info(f"[CF Cookie] Warmup done: {ok}/{len(unique)} succeeded")
+
+    def invalidate(
+        self, proxy_url: Optional[str] = None, target_url: str = DEFAULT_TARGET_URL
+    ):
+        """Invalidate cached cookies for a specific proxy and target site."""
+        key = self._cache_key(target_url, proxy_url)
         if key in self._cache:
             del self._cache[key]
-            print(f"[CF Cookie] Cache invalidated for proxy={key}")
+            logger.info(f"[CF Cookie] Cache invalidated for host={key[0]}, proxy={key[1]}")
+        # Cookies in the pooled context are likely rejected too; have the
+        # next fetch solve the challenge in a fresh context.
+        if key[1] in self._contexts:
+            self._discard_contexts.add(key[1])
 
     def invalidate_all(self):
         """Invalidate all cached cookies."""
         self._cache.clear()
-        print("[CF Cookie] All caches invalidated")
+        logger.info("[CF Cookie] All caches invalidated")
 
 
 # Global singleton instance
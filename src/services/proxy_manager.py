@@ -1,13 +1,27 @@
 """Proxy management module"""
-from typing import Optional
+import asyncio
+import time
+from typing import Optional, Dict, Tuple
 from ..core.database import Database
 from ..core.models import ProxyConfig
 
 class ProxyManager:
     """Proxy configuration manager"""
 
+    # How long a resolved proxy URL is reused, in seconds
+    CACHE_TTL = 5
+
     def __init__(self, db: Database):
         self.db = db
+        # Resolved proxy URLs: { token_id: (proxy_url, timestamp) }
+        self._cache: Dict[Optional[int], Tuple[Optional[str], float]] = {}
+        # Per-token locks so a burst of lookups shares one DB round-trip
+        self._locks: Dict[Optional[int], asyncio.Lock] = {}
+        # Bumped on every invalidation; a lookup that started before a bump
+        # must not write its (possibly outdated) result back to the cache
+        self._generation = 0
+        # Global proxy config: (config, timestamp)
+        self._config_cache: Optional[Tuple[ProxyConfig, float]] = None
 
     async def get_proxy_url(self, token_id: Optional[int] = None, proxy_url: Optional[str] = None) -> Optional[str]:
         """Get proxy URL for a token, with fallback to global proxy
@@ -24,22 +38,66 @@ class ProxyManager:
         if proxy_url:
             return proxy_url
 
-        # If token_id is provided, try to get token-specific proxy first
+        entry = self._cache.get(token_id)
+        if entry and (time.monotonic() - entry[1]) < self.CACHE_TTL:
+            return entry[0]
+
+        lock = self._locks.get(token_id)
+        if lock is None:
+            lock = self._locks[token_id] = asyncio.Lock()
+        async with lock:
+            # Another caller may have resolved it while we waited
+            entry = self._cache.get(token_id)
+            if entry and (time.monotonic() - entry[1]) < self.CACHE_TTL:
+                return entry[0]
+
+            generation = self._generation
+            resolved = await self._resolve_proxy_url(token_id)
+            if generation == self._generation:
+                self._cache[token_id] = (resolved, time.monotonic())
+            return resolved
+
+    async def _resolve_proxy_url(self, token_id: Optional[int]) -> Optional[str]:
+        """Look up the effective proxy URL in the database"""
+        # Token and global config lookups are independent, run them together
         if token_id is not None:
-            token = await self.db.get_token(token_id)
-            if token and token.proxy_url:
-                return token.proxy_url
+            token, config = await asyncio.gather(
+                self.db.get_token(token_id),
+                self.get_proxy_config(),
+            )
+        else:
+            token, config = None, await self.get_proxy_config()
+
+        # Token-specific proxy takes precedence
+        if token and token.proxy_url:
+            return token.proxy_url
 
         # Fall back to global proxy
-        config = await self.db.get_proxy_config()
         if config.proxy_enabled and config.proxy_url:
             return config.proxy_url
         return None
 
+    def clear_cache(self, token_id: Optional[int] = None):
+        """Drop cached proxy lookups for one token, or all if token_id is None"""
+        self._generation += 1
+        if token_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(token_id, None)
+
     async def update_proxy_config(self, enabled: bool, proxy_url: Optional[str]):
         """Update proxy configuration"""
         await self.db.update_proxy_config(enabled, proxy_url)
+        self._config_cache = None
+        self.clear_cache()
 
     async def get_proxy_config(self) -> ProxyConfig:
-        """Get proxy configuration"""
-        return await self.db.get_proxy_config()
+        """Get proxy configuration (cached for CACHE_TTL seconds)"""
+        cached = self._config_cache
+        if cached and (time.monotonic() - cached[1]) < self.CACHE_TTL:
+            return cached[0]
+        generation = self._generation
+        config = await self.db.get_proxy_config()
+        if generation == self._generation:
+            self._config_cache = (config, time.monotonic())
+        return config
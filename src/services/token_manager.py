@@ -16,10 +16,12 @@ from ..core.logger import debug_logger
 class TokenManager:
     """Token lifecycle manager"""
 
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, proxy_manager: Optional[ProxyManager] = None):
         self.db = db
         self._lock = asyncio.Lock()
-        self.proxy_manager = ProxyManager(db)
+        # Share the app's ProxyManager so its lookup cache is invalidated
+        # consistently by admin proxy updates
+        self.proxy_manager = proxy_manager or ProxyManager(db)
         self.fake = Faker()
     
     async def decode_jwt(self, token: str) -> dict:
@@ -983,6 +985,10 @@ class TokenManager:
                                    image_enabled=image_enabled, video_enabled=video_enabled,
                                    image_concurrency=image_concurrency, video_concurrency=video_concurrency)
 
+        # Make a changed per-token proxy take effect immediately
+        if proxy_url is not None:
+            self.proxy_manager.clear_cache(token_id)
+
         # If token (AT) is updated and not in offline mode, test it and clear expired flag if valid
         if token and not skip_status_update:
             try: